@@ -1,5 +1,9 @@
+import sys
 from collections import deque
+from itertools import islice
 from MultilevelQueueBase import MultilevelQueueBase
+from Process import Process
+from Scheduler import TimelineSink
 
 class MLFQ(MultilevelQueueBase):
     """
@@ -17,18 +21,21 @@ class MLFQ(MultilevelQueueBase):
         time_quantum_q2 (int): The time quantum for round-robin scheduling in queue 2.
         aging_threshold (int): The threshold time after which a process is aged up.
         priority_step (int): The step size for determining queue assignment based on priority.
-        processes (list): List of processes to be scheduled, sorted by arrival time.
-        timeline (list): A list representing the execution timeline of processes.
+        arrivals (deque): Processes that have not arrived yet, sorted by arrival time.
+        timeline (list): The execution timeline as (process, length) segments, where process is a Process or "Idle".
+        sink (callable): Optional callback the timeline is streamed to as (start time, process, length) segments.
         time (int): The current time in the scheduling simulation.
-        i (int): Index for tracking process arrivals.
         queues (list): A list of deques representing the three priority queues.
+        ready_count (int): Total number of processes waiting in the queues.
+        nonempty_mask (int): Bit mask of the non-empty queues, where bit i is set if queue i has waiting processes.
+        waiting_since (list): Time at which each queued process started waiting in its current queue, indexed by Process.index.
         current (Process): The currently executing process.
         current_queue (int): The index of the queue from which the current process was selected.
         quantum_counter (int): Counter for tracking the time spent on the current process for round-robin scheduling.
         num_queues (int): Number of queues (default: 3).
     """
     
-    def __init__(self, time_quantum_q1, time_quantum_q2, aging_threshold, num_queues=3):
+    def __init__(self, time_quantum_q1: int, time_quantum_q2: int, aging_threshold: int, num_queues: int = 3) -> None:
         """
         Initializes the MLFQ scheduler with a specified time quantum.
         Args:
@@ -42,82 +49,127 @@ class MLFQ(MultilevelQueueBase):
         self.time_quantum_q2 = time_quantum_q2
         self.aging_threshold = aging_threshold
 
-    def _process_arrivals_preemptive(self):
+    def _initialize_state(self, processes: list[Process], sink: TimelineSink | None = None) -> None:
+        """
+        Initializes the scheduler state, the queues and the waiting times used for aging before running.
+        """
+        super()._initialize_state(processes, sink)
+        self.queues: list[deque[Process]] = [deque() for _ in range(self.num_queues)]
+        self.nonempty_mask = 0
+        self.waiting_since = [0] * len(processes)
+        self._quantum_per_queue = (self.time_quantum_q1, self.time_quantum_q2) + (sys.maxsize,) * (self.num_queues - 2)
+
+    def _push(self, queue_index: int, proc: Process, left: bool = False) -> None:
+        """
+        Adds a process to one of the queues and updates the count of queued processes and the non-empty queue mask.
+
+        Args:
+            queue_index (int): The index of the queue the process is added to.
+            proc (Process): The process to enqueue.
+            left (bool): If True, the process is added to the front of the queue instead of the back.
+        """
+        if left:
+            self.queues[queue_index].appendleft(proc)
+        else:
+            self.queues[queue_index].append(proc)
+        self.ready_count += 1
+        self.nonempty_mask |= 1 << queue_index
+
+    def _pop(self, queue_index: int) -> Process:
+        """
+        Removes the process at the front of one of the queues and updates the count of queued processes and the non-empty queue mask.
+
+        Args:
+            queue_index (int): The index of the queue to pop from.
+        Returns:
+            Process: The process that was at the front of the queue.
+        """
+        queue = self.queues[queue_index]
+        proc = queue.popleft()
+        self.ready_count -= 1
+        if not queue:
+            self.nonempty_mask &= ~(1 << queue_index)
+        return proc
+
+    def _pop_next(self) -> tuple[int, Process]:
+        """
+        Removes the process at the front of the highest priority non-empty queue.
+
+        Returns:
+            tuple: The queue index and the process removed from it.
+        """
+        # The lowest set bit of the mask is the highest priority non-empty queue
+        mask = self.nonempty_mask
+        idx = (mask & -mask).bit_length() - 1
+        return idx, self._pop(idx)
+
+    def _process_arrivals_preemptive(self) -> None:
         """
         Processes new arrivals at the current time, assigning them to the appropriate queues based on their priority.
 
         If a new process has a higher priority than the currently executing process, 
         it preempts the current process and is added to the front of its respective queue.
         """
-        while self.i < len(self.processes) and self.processes[self.i].arrival <= self.time:
-            proc = self.processes[self.i]
-            queue_index = self._assign_queue(proc.priority)
-            self.queues[queue_index].append(proc)
-            self.waiting_since[proc.id] = self.time
+        while self.arrivals and self.arrivals[0].arrival <= self.time:
+            proc = self.arrivals.popleft()
+            queue_index = proc.queue_index
+            self._push(queue_index, proc)
+            self.waiting_since[proc.index] = self.time
             if self.current and queue_index < self.current_queue:
-                self.queues[self.current_queue].appendleft(self.current)
-                self.waiting_since[self.current.id] = self.time
-                self.context_switches += 1
-                self.current = None
-            self.i += 1
+                preempted = self._preempt_current()
+                self.waiting_since[preempted.index] = self.time
 
-    def _process_aging(self):
+    def _process_aging(self) -> None:
         """
         Implements aging by promoting processes that have been waiting for a long time in lower priority queues to higher priority queues.
+
+        Processes enter a queue in the order they start waiting, so only the oldest ones at the front need to be checked.
+        The only exception is a preempted process, which is put back at the head of its queue with a newer waiting time;
+        in that case it is set aside while the rest of the queue is checked.
         """
         for idx in range(1, self.num_queues):
-            for _ in range(len(self.queues[idx])):
-                proc = self.queues[idx].popleft()
-                if self.time - self.waiting_since.get(proc.id, proc.arrival) >= self.aging_threshold:
-                    self.queues[idx - 1].append(proc)
-                    self.waiting_since[proc.id] = self.time
-                else:
-                    self.queues[idx].append(proc)
-
-    def _execute_current_process(self):
-        """
-        Executes the currently selected process for one time unit, updating the timeline and handling process completion or quantum expiration.
-        
-        - If the process finishes execution, it is marked as completed and removed from the current slot.
-        - If the process reaches its time quantum limit without finishing, it is demoted to a lower priority queue (if applicable) and the scheduler selects the next process to execute.
-        """
-        self.timeline.append(self.current)
-        self.current.remaining -= 1
-        self.quantum_counter += 1
-        
-        if self.current.remaining == 0:
-            self.current.finish_time = self.time + 1
-            self.current.calculate_metrics()
-            self.waiting_since.pop(self.current.id, None)
-            self.current = None
-        elif (self.current_queue == 0 and self.quantum_counter == self.time_quantum_q1) or (self.current_queue == 1 and self.quantum_counter == self.time_quantum_q2):
-            self.queues[self.current_queue + 1].append(self.current)
-            self.waiting_since[self.current.id] = self.time + 1
-            self.current = None
-
-
-    def run(self, processes):
-        """
-        Runs the MLFQ scheduling algorithm on the given list of processes.
+            queue = self.queues[idx]
+            head: Process | None = None
+            if queue and not self._is_aged(queue[0]):
+                head = self._pop(idx)
+            while queue and self._is_aged(queue[0]):
+                proc = self._pop(idx)
+                self._push(idx - 1, proc)
+                self.waiting_since[proc.index] = self.time
+            if head is not None:
+                self._push(idx, head, left=True)
+
+    def _is_aged(self, proc: Process) -> bool:
+        """
+        Checks whether a queued process has waited long enough to be promoted.
+
         Args:
-            processes (list): A list of Process objects to be scheduled.
+            proc (Process): A process waiting in one of the lower priority queues.
+        Returns:
+            bool: True if the process reached the aging threshold.
+        """
+        return self.time - self.waiting_since[proc.index] >= self.aging_threshold
+
+    def _next_aging_time(self) -> int:
+        """
+        Returns the earliest time at which a process waiting in a lower priority queue reaches the aging threshold.
+        Only the first two processes of each queue are candidates (see _process_aging).
+
         Returns:
-            list: A timeline of process execution.
-        """
-        self._initialize_state(processes)
-        self.waiting_since = {}
-        
-        
-        while self.i < len(self.processes) or any(self.queues) or self.current:
-            self._process_arrivals_preemptive()
-            self._process_aging()
-            if not self.current:
-                self._select_next_process()
-            if self.current:
-                
-                self._execute_current_process()
-            else:
-                self.timeline.append("Idle")
-            self.time += 1
-        
-        return self.timeline
+            int: The time of the next promotion, or sys.maxsize if no process can be aged.
+        """
+        waiting = [self.waiting_since[proc.index] for queue in self.queues[1:] for proc in islice(queue, 2)]
+        if not waiting:
+            return sys.maxsize
+        return max(min(waiting) + self.aging_threshold, self.time + 1)
+
+    def _expire_quantum(self, proc: Process) -> None:
+        """
+        Demotes a process that used up its quantum to the next lower priority queue.
+        The last queues are FCFS and have no quantum, so a process never expires there.
+
+        Args:
+            proc (Process): The process whose quantum expired.
+        """
+        self._push(self.current_queue + 1, proc)
+        self.waiting_since[proc.index] = self.time
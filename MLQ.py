@@ -1,5 +1,7 @@
-from collections import deque
+import heapq
 from MultilevelQueueBase import MultilevelQueueBase
+from Process import Process
+from Scheduler import TimelineSink
 
 class MLQ(MultilevelQueueBase):
     """
@@ -10,22 +12,24 @@ class MLQ(MultilevelQueueBase):
     - Processes are assigned to queues based on their priority, with the range of priorities divided into three equal parts.
     - Processes cannot move between queues once assigned, but they can be preempted by higher priority processes.
     - Quantum for queue i is time_quantum * (2^i), meaning higher priority queues have shorter quantums.
+    - All queues share a single heap ordered by (queue index, insertion order), so the next process is always at the top.
 
     Attributes:
         time_quantum (int): The time quantum for round-robin scheduling within each queue.
         priority_step (int): The step size for determining queue assignment based on priority.
-        processes (list): List of processes to be scheduled, sorted by arrival time.
-        timeline (list): A list representing the execution timeline of processes.
+        arrivals (deque): Processes that have not arrived yet, sorted by arrival time.
+        timeline (list): The execution timeline as (process, length) segments, where process is a Process or "Idle".
+        sink (callable): Optional callback the timeline is streamed to as (start time, process, length) segments.
         time (int): The current time in the scheduling simulation.
-        i (int): Index for tracking process arrivals.
-        queues (list): A list of deques representing the three priority queues.
+        ready (list): A heap of (queue index, sequence, process) entries holding the processes waiting in all queues.
+        ready_count (int): Total number of processes waiting in the queues.
         current (Process): The currently executing process.
         current_queue (int): The index of the queue from which the current process was selected.
         quantum_counter (int): Counter for tracking the time spent on the current process for round-robin scheduling.
         num_queues (int): Number of queues (default: 3).
     """
     
-    def __init__(self, time_quantum, num_queues=3):
+    def __init__(self, time_quantum: int, num_queues: int = 3) -> None:
         """
         Initializes the MLQ scheduler with a specified time quantum.
         Args:
@@ -35,58 +39,66 @@ class MLQ(MultilevelQueueBase):
         self.num_queues = num_queues
         self.time_quantum = time_quantum
 
-    def _process_arrivals_preemptive(self):
+    def _initialize_state(self, processes: list[Process], sink: TimelineSink | None = None) -> None:
+        """
+        Initializes the scheduler state and the ready heap before running.
+        Quantum for queue i is time_quantum * (2^i), so higher priority queues have shorter quantums.
+        """
+        super()._initialize_state(processes, sink)
+        self._quantum_per_queue = tuple(self.time_quantum << i for i in range(self.num_queues))
+        self.ready: list[tuple[int, int, Process]] = []
+        self._front_seq = 0
+        self._back_seq = 0
+
+    def _push(self, queue_index: int, proc: Process, left: bool = False) -> None:
+        """
+        Adds a process to the ready heap. Within a queue, processes are served in insertion order;
+        a process added to the front gets a sequence number lower than any other in the heap.
+
+        Args:
+            queue_index (int): The index of the queue the process belongs to.
+            proc (Process): The process to enqueue.
+            left (bool): If True, the process is served before the others in its queue.
+        """
+        if left:
+            self._front_seq -= 1
+            seq = self._front_seq
+        else:
+            self._back_seq += 1
+            seq = self._back_seq
+        heapq.heappush(self.ready, (queue_index, seq, proc))
+        self.ready_count += 1
+
+    def _pop_next(self) -> tuple[int, Process]:
+        """
+        Removes the next process to run from the ready heap.
+
+        Returns:
+            tuple: The queue index and the process removed from it.
+        """
+        queue_index, _, proc = heapq.heappop(self.ready)
+        self.ready_count -= 1
+        return queue_index, proc
+
+    def _process_arrivals_preemptive(self) -> None:
         """
         Processes new arrivals at the current time, assigning them to the appropriate queues based on their priority.
 
         If a new process has a higher priority than the currently executing process, 
         it preempts the current process and is added to the front of its respective queue.
         """
-        while self.i < len(self.processes) and self.processes[self.i].arrival <= self.time:
-            proc = self.processes[self.i]
-            queue_index = self._assign_queue(proc.priority)
-            self.queues[queue_index].append(proc)
+        while self.arrivals and self.arrivals[0].arrival <= self.time:
+            proc = self.arrivals.popleft()
+            queue_index = proc.queue_index
+            self._push(queue_index, proc)
             if self.current and proc.priority < self.current.priority:
-                self.queues[self.current_queue].appendleft(self.current)
-                self.context_switches += 1
-                self.current = None
-            self.i += 1
+                self._preempt_current()
 
-    def _execute_current_process(self):
+    def _expire_quantum(self, proc: Process) -> None:
         """
-        Executes the currently selected process for one time unit, updating the timeline and handling process completion or quantum expiration.
-        """
-        self.timeline.append(self.current)
-        self.current.remaining -= 1
-        self.quantum_counter += 1
-        
-        if self.current.remaining == 0:
-            self.current.finish_time = self.time + 1
-            self.current.calculate_metrics()
-            self.current = None
-        # Lower quantum for higher priority queues
-        elif self.quantum_counter == self.time_quantum * (2 ** self.current_queue):
-            self.queues[self.current_queue].append(self.current)
-            self.current = None
-
+        Sends a process that used up its quantum to the back of its own queue.
 
-    def run(self, processes):
-        """
-        Runs the MLQ scheduling algorithm on a list of processes.
         Args:
-            processes (list): A list of Process objects to be scheduled.
-        Returns:
-            list: A timeline of process execution.
+            proc (Process): The process whose quantum expired.
         """
-        self._initialize_state(processes) 
-        while self.i < len(self.processes) or any(self.queues) or self.current:
-            self._process_arrivals_preemptive()
-            if not self.current:
-                self._select_next_process()
-            if self.current:
-                self._execute_current_process()
-            else:
-                self.timeline.append("Idle")
-            self.time += 1
-        
-        return self.timeline
+        self._push(self.current_queue, proc)
@@ -1,16 +1,24 @@
+import sys
 from abc import ABC, abstractmethod
-from Scheduler import Scheduler
+from Process import Process
+from Scheduler import Scheduler, TimelineSink
 from collections import deque
 
 class MultilevelQueueBase(Scheduler, ABC):
     """
     Abstract base class for multilevel queue schedulers.
-    Provides common functionality for assigning processes to queues and selecting processes.
-    Subclasses must implement _process_arrivals_preemptive, _execute_current_process, and run.
-    Subclasses must set self.num_queues in their __init__ method.
+    Provides common functionality for assigning processes to queues, selecting and executing processes,
+    and the event-driven simulation loop.
+    Subclasses provide the ready set through _push and _pop_next, implement _process_arrivals_preemptive
+    and _expire_quantum, and may implement aging.
+    Subclasses must set self.num_queues in their __init__ method and self._quantum_per_queue in _initialize_state.
     """
 
-    def _assign_queue(self, priority):
+    num_queues: int
+    current: Process | None
+    _quantum_per_queue: tuple[int, ...]
+
+    def _assign_queue(self, priority: int) -> int:
         """
         Determines the queue index for a process based on its priority.
         The priority range (0 to max priority) is divided equally among queues.
@@ -21,62 +29,199 @@ class MultilevelQueueBase(Scheduler, ABC):
         Returns:            
             int: The index of the queue to which the process should be assigned.
         """
-        for i in range(self.num_queues - 1):
-            if priority < (i + 1) * self.priority_step:
-                return i
-        return self.num_queues - 1
+        return min(max(priority // self.priority_step, 0), self.num_queues - 1)
+
+    @abstractmethod
+    def _push(self, queue_index: int, proc: Process, left: bool = False) -> None:
+        """
+        Adds a process to the ready set and increments ready_count.
+        Must be implemented by subclasses.
+
+        Args:
+            queue_index (int): The index of the queue the process is added to.
+            proc (Process): The process to enqueue.
+            left (bool): If True, the process is served before the others in its queue.
+        """
+        pass
+
+    def _record(self, entry: Process | str, length: int) -> None:
+        """
+        Adds a run of consecutive time units to the run-length encoded timeline.
+        If the last segment belongs to the same entry, it is extended instead of adding a new one.
+        When streaming to a sink, the previous segment is complete at this point and is passed to the sink.
+
+        Args:
+            entry (Process or str): The process that ran, or "Idle".
+            length (int): Number of time units of the run.
+        """
+        timeline = self.timeline
+        if timeline and timeline[-1][0] == entry:
+            timeline[-1] = (entry, timeline[-1][1] + length)
+        else:
+            if self.sink is not None:
+                self._flush_timeline()
+            timeline.append((entry, length))
+
+    def _flush_timeline(self) -> None:
+        """
+        Passes the pending timeline segment, if any, to the sink as (start time, process, length).
+        """
+        if self.sink is not None and self.timeline:
+            entry, length = self.timeline.pop()
+            self.sink(self._flushed_time, entry, length)
+            self._flushed_time += length
+
+    @abstractmethod
+    def _pop_next(self) -> tuple[int, Process]:
+        """
+        Removes the next process to run from the highest priority non-empty queue and decrements ready_count.
+        Must be implemented by subclasses.
+
+        Returns:
+            tuple: The queue index and the process removed from it.
+        """
+        pass
+
+    def _preempt_current(self) -> Process:
+        """
+        Puts the running process back at the front of its queue and counts the context switch.
+        Context switches are only counted here, when a running process is displaced by a new arrival.
+
+        Returns:
+            Process: The preempted process.
+        """
+        current = self.current
+        assert current is not None
+        self._push(self.current_queue, current, left=True)
+        self.context_switches += 1
+        self.current = None
+        return current
 
-    def _select_next_process(self):
+    def _select_next_process(self) -> None:
         """
         Selects the next process to execute from the highest priority non-empty queue.
         """
-        for idx in range(self.num_queues):
-            if self.queues[idx]:
-                self.current = self.queues[idx].popleft()
-                self.current_queue = idx
-                self.quantum_counter = 0
-                if self.current.start_time is None:
-                    self.current.start_time = self.time
-                break
+        if not self.ready_count:
+            return
+        self.current_queue, self.current = self._pop_next()
+        self.quantum_counter = 0
+        if self.current.start_time is None:
+            self.current.start_time = self.time
 
-    def _initialize_state(self, processes):
+    def _initialize_state(self, processes: list[Process], sink: TimelineSink | None = None) -> None:
         """
         Initializes common scheduler state before running.
         Calculates priority_step by dividing the range from 0 to max priority
-        equally among the number of queues.
+        equally among the number of queues, and assigns each process its queue
+        and a dense index (0..n-1) that schedulers can use for per-process lookup tables.
         """
         max_priority = max(p.priority for p in processes)
         self.priority_step = max(1, (max_priority + 1) // self.num_queues)
-        self.processes = sorted(processes, key=lambda p: p.arrival)
-        self.timeline = []
+        self.arrivals = deque(sorted(processes, key=lambda p: p.arrival))
+        for i, p in enumerate(self.arrivals):
+            p.queue_index = self._assign_queue(p.priority)
+            p.index = i
+        self.timeline: list[tuple[Process | str, int]] = []
+        self.sink = sink
+        self._flushed_time = 0
         self.time = 0
-        self.i = 0
-        self.queues = [deque() for _ in range(self.num_queues)]
+        self.ready_count = 0
         self.current = None
         self.current_queue = -1
         self.quantum_counter = 0
         self.context_switches = 0
 
     @abstractmethod
-    def _process_arrivals_preemptive(self):
+    def _process_arrivals_preemptive(self) -> None:
         """
         Processes new arrivals at the current time.
         Must be implemented by subclasses.
         """
         pass
 
-    @abstractmethod
-    def _execute_current_process(self):
+    def _process_aging(self) -> None:
         """
-        Executes the currently selected process.
-        Must be implemented by subclasses.
+        Promotes processes that have waited too long in lower priority queues.
+        Schedulers without aging leave this empty.
         """
         pass
 
+    def _next_aging_time(self) -> int:
+        """
+        Returns the earliest time at which a waiting process is promoted by aging.
+        Schedulers without aging never promote processes.
+
+        Returns:
+            int: The time of the next promotion, or sys.maxsize if no process can be aged.
+        """
+        return sys.maxsize
+
     @abstractmethod
-    def run(self, processes):
+    def _expire_quantum(self, proc: Process) -> None:
         """
-        Runs the scheduling algorithm.
+        Puts back a process that used up its quantum without finishing.
         Must be implemented by subclasses.
+
+        Args:
+            proc (Process): The process whose quantum expired.
         """
         pass
+
+    def _execute_current_process(self, step: int) -> None:
+        """
+        Executes the currently selected process for `step` consecutive time units, updating the timeline and handling process completion or quantum expiration.
+
+        Args:
+            step (int): Number of time units to run the process for. It never exceeds the remaining burst, the remaining quantum or the time until the next arrival or promotion.
+        """
+        current = self.current
+        assert current is not None
+        self._record(current, step)
+        current.remaining -= step
+        self.quantum_counter += step
+        self.time += step
+
+        if current.remaining == 0:
+            current.finish_time = self.time
+            current.calculate_metrics()
+            self.current = None
+        elif self.quantum_counter == self._quantum_per_queue[self.current_queue]:
+            self._expire_quantum(current)
+            self.current = None
+
+    def run(self, processes: list[Process], sink: TimelineSink | None = None) -> list[tuple[Process | str, int]]:
+        """
+        Runs the scheduling algorithm on a list of processes.
+
+        Time advances from event to event (arrival, promotion, completion or quantum expiration)
+        instead of one unit at a time; idle gaps are skipped in a single step.
+        Args:
+            processes (list): A list of Process objects to be scheduled.
+            sink (callable): Optional callback receiving each finished timeline segment as (start time, process, length).
+                When given, segments are streamed to it instead of being kept in the returned timeline.
+        Returns:
+            list: A run-length encoded timeline of process execution, as (process, length) segments (empty when streaming to a sink).
+        """
+        self._initialize_state(processes, sink)
+        arrivals = self.arrivals
+        quantums = self._quantum_per_queue
+
+        while self.ready_count or self.current or arrivals:
+            self._process_arrivals_preemptive()
+            self._process_aging()
+            if not self.current:
+                self._select_next_process()
+            next_arrival = arrivals[0].arrival if arrivals else sys.maxsize
+            current = self.current
+            if current:
+                step = min(current.remaining, quantums[self.current_queue] - self.quantum_counter,
+                           next_arrival - self.time, self._next_aging_time() - self.time)
+                self._execute_current_process(step)
+            else:
+                gap = next_arrival - self.time
+                self._record("Idle", gap)
+                self.time += gap
+
+        if sink is not None:
+            self._flush_timeline()
+        return self.timeline
@@ -15,9 +15,15 @@ class Process:
         turnaround (int): Total turnaround time of the process (initially 0).
         response_time (int): Time from arrival to first execution (initially None).
         context_switches (int): Number of times the process was context switched (initially 0).
+        queue_index (int): Queue the process enters on arrival, set by multilevel queue schedulers (initially -1).
+        index (int): Dense position of the process in the scheduled set, set by multilevel queue schedulers (initially -1).
     """
 
-    def __init__(self, id, arrival, burst, priority):
+    __slots__ = ('id', 'arrival', 'burst', 'priority', 'remaining', 'start_time',
+                 'finish_time', 'waiting_time', 'turnaround', 'response_time', 'queue_index',
+                 'index')
+
+    def __init__(self, id: int, arrival: int, burst: int, priority: int) -> None:
         """
         Initialize a new process with the given attributes.
 
@@ -27,26 +33,38 @@ class Process:
             burst (int): Total CPU time required by the process.
             priority (int): Priority level of the process (lower value means higher priority).
         """
-        self.id = id
-        self.arrival = arrival
-        self.burst = burst
-        self.priority = priority
-        self.remaining = burst
-        self.start_time = None
-        self.finish_time = None
-        self.waiting_time = 0
-        self.turnaround = 0
-        self.response_time = None
+        self.id: int = id
+        self.arrival: int = arrival
+        self.burst: int = burst
+        self.priority: int = priority
+        self.remaining: int = burst
+        self.start_time: int | None = None
+        self.finish_time: int | None = None
+        self.waiting_time: int = 0
+        self.turnaround: int = 0
+        self.response_time: int | None = None
+        self.queue_index: int = -1
+        self.index: int = -1
 
-    def calculate_metrics(self):
+    def calculate_metrics(self) -> None:
         """
         Calculate and update the waiting time, turnaround time, and response time for the process.
         """
+        assert self.start_time is not None and self.finish_time is not None
         self.turnaround = self.finish_time - self.arrival
         self.waiting_time = self.turnaround - self.burst
         self.response_time = self.start_time - self.arrival
 
-    def __repr__(self):
+    def clone(self) -> "Process":
+        """
+        Create a fresh copy of the process with the same input attributes and no scheduling state.
+
+        Returns:
+            Process: A new process with the same id, arrival, burst and priority.
+        """
+        return Process(self.id, self.arrival, self.burst, self.priority)
+
+    def __repr__(self) -> str:
         """
         Return a string representation of the process.
         Returns:
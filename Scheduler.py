@@ -1,14 +1,19 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from Process import Process
 
+# Receives each finished timeline segment as (start time, process or "Idle", length)
+TimelineSink = Callable[[int, Process | str, int], None]
+
 class Scheduler(ABC):
     """
     Abstract class representing a CPU scheduling algorithm. 
     """
 
     @abstractmethod
-    def run(self, processes):
+    def run(self, processes: list[Process], sink: TimelineSink | None = None) -> list[tuple[Process | str, int]]:
         """
         Run the scheduling algorithm on the given list of processes.
+        If a sink is given, the timeline is streamed to it instead of being kept in memory.
         """
         pass
\ No newline at end of file
@@ -1,5 +1,6 @@
 import csv
-from copy import deepcopy
+from contextlib import contextmanager
+from itertools import repeat
 from Process import Process
 from MLFQ import MLFQ
 from MLQ import MLQ
@@ -20,19 +21,20 @@ def read_processes():
         pass
     return processes
 
-def write_timeline(timeline, name):
+@contextmanager
+def timeline_writer(name):
     """
-    Writes the timeline of process execution to a CSV file.
+    Opens the timeline CSV file and yields a sink that streams timeline segments to it, one row per time unit.
 
     Args:
-        timeline (list): A list representing the execution timeline of processes, where each entry is either a Process ID or "Idle".
         name (str): The base name for the output CSV file.
+    Yields:
+        callable: A sink accepting (start time, process, length) segments, as passed by the schedulers.
     """
-    with open(f"metrics/{name}_timeline.csv", "w") as f:
+    with open(f"metrics/{name}_timeline.csv", "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["Time", "Process"])
-        for time, proc in enumerate(timeline):
-            writer.writerow([time, proc])
+        yield lambda start, proc, length: writer.writerows(zip(range(start, start + length), repeat(proc)))
 
 def write_metrics(processes, name):
     """
@@ -42,11 +44,10 @@ def write_metrics(processes, name):
         processes (list): A list of Process objects, each containing metrics such as arrival time, burst time, priority, start time, finish time, waiting time, turnaround time, and response time.
         name (str): The base name for the output CSV file.
     """
-    with open(f"metrics/{name}_metrics.csv", "w") as f:
+    with open(f"metrics/{name}_metrics.csv", "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["Process ID", "Arrival", "Burst", "Priority", "Start Time", "Finish Time", "Waiting Time", "Turnaround Time", "Response Time"])
-        for p in processes:
-            writer.writerow([f"P{p.id}", p.arrival, p.burst, p.priority, p.start_time, p.finish_time, p.waiting_time, p.turnaround, p.response_time])
+        writer.writerows([[f"P{p.id}", p.arrival, p.burst, p.priority, p.start_time, p.finish_time, p.waiting_time, p.turnaround, p.response_time] for p in processes])
 
 def write_summary(context_switches, name):
     """
@@ -56,7 +57,7 @@ def write_summary(context_switches, name):
         context_switches (int): Total number of context switches.
         name (str): The base name for the output CSV file.
     """
-    with open(f"metrics/{name}_summary.csv", "w") as f:
+    with open(f"metrics/{name}_summary.csv", "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["Metric", "Value"])
         writer.writerow(["Total Context Switches", context_switches])
@@ -68,19 +69,19 @@ def main():
         return
     time_quantum = 8
     scheduler = MLQ(time_quantum)
-    processes_copy = deepcopy(processes)
-    timeline = scheduler.run(processes_copy)
-    write_timeline(timeline, "mlq")
+    processes_copy = [p.clone() for p in processes]
+    with timeline_writer("mlq") as sink:
+        scheduler.run(processes_copy, sink=sink)
     write_metrics(processes_copy, "mlq")
     write_summary(scheduler.context_switches, "mlq")
 
     time_quantum_q1 = 8
     time_quantum_q2 = 16
     aging_threshold = 100
-    processes_copy = deepcopy(processes)
+    processes_copy = [p.clone() for p in processes]
     scheduler_mlfq = MLFQ(time_quantum_q1, time_quantum_q2, aging_threshold)
-    timeline_mlfq = scheduler_mlfq.run(processes_copy)
-    write_timeline(timeline_mlfq, "mlfq")
+    with timeline_writer("mlfq") as sink:
+        scheduler_mlfq.run(processes_copy, sink=sink)
     write_metrics(processes_copy, "mlfq")
     write_summary(scheduler_mlfq.context_switches, "mlfq")
 
@@ -1,19 +1,16 @@
-import random
+import numpy as np
 
 # Generate diverse process set
 num_processes = 100
-processes = []
+rng = np.random.default_rng()
 
-for i in range(1, num_processes + 1):
-    arrival = (i - 1) * 2  # Staggered arrivals
-    burst = random.randint(1, 100)  # Burst time 1-100
-    priority = random.randint(1, 5)  # Priority 1-5
-    processes.append(f"{i} {arrival} {burst} {priority}")
+ids = np.arange(1, num_processes + 1)
+arrival = np.arange(num_processes) * 2  # Staggered arrivals
+burst = rng.integers(1, 101, size=num_processes)  # Burst time 1-100
+priority = rng.integers(1, 6, size=num_processes)  # Priority 1-5
 
 # Write to file
-with open('processes_diverse.txt', 'w') as f:
-    f.write('\n'.join(processes))
-    f.write('\n') 
+np.savetxt('processes_diverse.txt', np.column_stack([ids, arrival, burst, priority]), fmt='%d')
 
 print(f"Generated {num_processes} diverse processes")
 print("Priority range: 1-5")
@@ -1,21 +1,19 @@
-import random
+import numpy as np
 
 # Generate diverse process set with random arrivals
 num_processes = 100
-processes = []
+rng = np.random.default_rng()
 
-for i in range(1, num_processes + 1):
-    arrival = random.randint(0, 200)
-    burst = random.randint(1, 100)  
-    priority = random.randint(1, 5) 
-    processes.append(f"{i} {arrival} {burst} {priority}")
+ids = np.arange(1, num_processes + 1)
+arrival = rng.integers(0, 201, size=num_processes)
+burst = rng.integers(1, 101, size=num_processes)
+priority = rng.integers(1, 6, size=num_processes)
 
-processes.sort(key=lambda x: int(x.split()[1]))  # Sort by arrival time
+processes = np.column_stack([ids, arrival, burst, priority])
+processes = processes[np.argsort(arrival, kind='stable')]  # Sort by arrival time
 
 # Write to file
-with open('processes_random.txt', 'w') as f:
-    f.write('\n'.join(processes))
-    f.write('\n') 
+np.savetxt('processes_random.txt', processes, fmt='%d')
 
 print(f"Generated {num_processes} diverse processes")
 print("Arrival time range: 0-200 (random)")